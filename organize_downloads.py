@@ -6,29 +6,64 @@ Automatically organizes files in your Downloads folder into categorized subfolde
 
 import os
 import sys
-import shutil
+import errno
+import stat
 import logging
 import json
 from pathlib import Path
 from datetime import datetime
-from collections import defaultdict
-import argparse
+from collections import defaultdict, deque, namedtuple
 
 
 # Default file extension categories
 DEFAULT_CATEGORIES = {
-    'Images': ['.jpg', '.jpeg', '.png', '.gif', '.webp', '.bmp', '.svg', '.ico'],
-    'Documents': ['.pdf', '.docx', '.xlsx', '.txt', '.pptx', '.doc', '.xls', '.ppt', '.odt', '.csv'],
-    'Videos': ['.mp4', '.mkv', '.mov', '.avi', '.flv', '.wmv', '.webm'],
-    'Archives': ['.zip', '.rar', '.7z', '.tar', '.gz', '.bz2', '.xz'],
-    'Installers': ['.exe', '.msi', '.dmg', '.deb', '.rpm', '.pkg', '.apk'],
-    'Music': ['.mp3', '.wav', '.flac', '.aac', '.ogg', '.m4a', '.wma'],
-    'Code': ['.py', '.js', '.java', '.cpp', '.c', '.h', '.cs', '.php', '.rb', '.go', '.rs', '.ts', '.html', '.css']
+    'Images': frozenset({'.jpg', '.jpeg', '.png', '.gif', '.webp', '.bmp', '.svg', '.ico'}),
+    'Documents': frozenset({'.pdf', '.docx', '.xlsx', '.txt', '.pptx', '.doc', '.xls', '.ppt', '.odt', '.csv'}),
+    'Videos': frozenset({'.mp4', '.mkv', '.mov', '.avi', '.flv', '.wmv', '.webm'}),
+    'Archives': frozenset({'.zip', '.rar', '.7z', '.tar', '.gz', '.bz2', '.xz'}),
+    'Installers': frozenset({'.exe', '.msi', '.dmg', '.deb', '.rpm', '.pkg', '.apk'}),
+    'Music': frozenset({'.mp3', '.wav', '.flac', '.aac', '.ogg', '.m4a', '.wma'}),
+    'Code': frozenset({'.py', '.js', '.java', '.cpp', '.c', '.h', '.cs', '.php', '.rb', '.go', '.rs', '.ts', '.html', '.css'})
 }
 
 # Global variable to hold active categories (can be overridden by config)
 CATEGORIES = DEFAULT_CATEGORIES.copy()
 
+# Files the organizer itself keeps in the target folder
+_LOG_NAME = 'organize.log'
+_CONFIG_NAME = 'organize_config.json'
+_HISTORY_NAME = '.organize_history.json'
+
+# Never moved, even though some of them have a known extension
+_SKIP_NAMES = frozenset({_LOG_NAME, _CONFIG_NAME, _HISTORY_NAME})
+
+# A single planned file move
+PlannedMove = namedtuple('PlannedMove', ['source', 'filename', 'category', 'target_folder', 'target_path'])
+
+# Upper bound on concurrent moves (keeps network mounts from being swamped)
+MAX_JOBS = 16
+
+# Month folder names for date-based organization (avoids strftime per file)
+_MONTHS = ('January', 'February', 'March', 'April', 'May', 'June', 'July',
+           'August', 'September', 'October', 'November', 'December')
+
+# Inverted index of extension -> category, rebuilt whenever CATEGORIES changes
+_EXT_TO_CATEGORY = {}
+
+
+def _rebuild_ext_index():
+    """
+    Rebuild the extension -> category lookup table from CATEGORIES.
+    The first category listing an extension wins, matching the old linear scan.
+    """
+    _EXT_TO_CATEGORY.clear()
+    for category, extensions in CATEGORIES.items():
+        for ext in extensions:
+            _EXT_TO_CATEGORY.setdefault(ext.lower(), category)
+
+
+_rebuild_ext_index()
+
 
 def get_downloads_folder():
     """
@@ -48,18 +83,30 @@ def get_downloads_folder():
     return downloads
 
 
-def setup_logging(downloads_path):
+def setup_logging(downloads_path, quiet=False):
     """
     Set up logging to both console and file.
+    File writes are buffered and flushed in batches (and on errors/exit).
+    With quiet=True the console only shows warnings and errors.
     """
-    log_file = downloads_path / 'organize.log'
+    # Only needed here; importing it pulls in socket, pickle and queue
+    from logging.handlers import MemoryHandler
+    
+    log_file = downloads_path / _LOG_NAME
+    log_format = '%(asctime)s - %(levelname)s - %(message)s'
+    
+    file_handler = logging.FileHandler(log_file, encoding='utf-8')
+    file_handler.setFormatter(logging.Formatter(log_format))
+    console_handler = logging.StreamHandler()
+    if quiet:
+        console_handler.setLevel(logging.WARNING)
     
     logging.basicConfig(
         level=logging.INFO,
-        format='%(asctime)s - %(levelname)s - %(message)s',
+        format=log_format,
         handlers=[
-            logging.FileHandler(log_file, encoding='utf-8'),
-            logging.StreamHandler()
+            MemoryHandler(capacity=1024, target=file_handler),
+            console_handler
         ]
     )
     
@@ -71,7 +118,7 @@ def load_config(downloads_path):
     Load custom categories from config.json if it exists.
     Returns custom categories or None if config doesn't exist.
     """
-    config_file = downloads_path / 'organize_config.json'
+    config_file = downloads_path / _CONFIG_NAME
     
     if not config_file.exists():
         return None
@@ -90,42 +137,85 @@ def get_category(file_extension):
     Determine the category for a file based on its extension.
     Returns the category name or None if no match.
     """
-    file_extension = file_extension.lower()
-    
-    for category, extensions in CATEGORIES.items():
-        if file_extension in extensions:
-            return category
-    
-    return None
+    # Extensions are usually already lowercase; skip the copy lower() makes
+    if not file_extension.islower():
+        file_extension = file_extension.lower()
+    return _EXT_TO_CATEGORY.get(file_extension)
 
 
-def is_system_or_hidden(file_path):
+def is_system_or_hidden(entry):
     """
-    Check if a file is a system or hidden file.
+    Check if a directory entry (from os.scandir) is a system or hidden file.
     """
     # Check if file starts with dot (hidden on Unix-like systems)
-    if file_path.name.startswith('.'):
+    if entry.name.startswith('.'):
         return True
     
-    # Check Windows hidden attribute
+    # Check Windows hidden/system attributes, which scandir already fetched
     if sys.platform == 'win32':
-        try:
-            import ctypes
-            attrs = ctypes.windll.kernel32.GetFileAttributesW(str(file_path))
-            # FILE_ATTRIBUTE_HIDDEN = 0x2
-            if attrs != -1 and attrs & 0x2:
-                return True
-        except Exception:
-            pass
+        attrs = entry.stat(follow_symlinks=False).st_file_attributes
+        if attrs & (stat.FILE_ATTRIBUTE_HIDDEN | stat.FILE_ATTRIBUTE_SYSTEM):
+            return True
     
     return False
 
 
+def _write_history(history_file, history):
+    """
+    Write the history file in one pass, replacing the old file atomically.
+    Uses compact separators to keep the file small.
+    """
+    tmp_file = history_file.with_name(history_file.name + '.tmp')
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(history, f, separators=(',', ':'))
+    os.replace(tmp_file, history_file)
+
+
+def move_file(source, destination):
+    """
+    Move a file with a single rename when possible.
+    Falls back to shutil.move() when source and destination are on
+    different filesystems.
+    """
+    try:
+        os.replace(source, destination)
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+        import shutil  # Only needed for the rare cross-device move
+        shutil.move(source, destination)
+
+
+def _try_move(move):
+    """
+    Run a single (source, destination) move, returning the error if it failed.
+    """
+    try:
+        move_file(*move)
+    except Exception as e:
+        return e
+    return None
+
+
+def run_moves(moves, jobs=1):
+    """
+    Run a list of (source, destination) moves, optionally on a thread pool.
+    Returns one entry per move, in order: None on success or the exception.
+    """
+    if jobs <= 1 or len(moves) <= 1:
+        return [_try_move(move) for move in moves]
+    
+    from concurrent.futures import ThreadPoolExecutor
+    
+    with ThreadPoolExecutor(max_workers=min(jobs, MAX_JOBS)) as executor:
+        return list(executor.map(_try_move, moves))
+
+
 def save_history(downloads_path, history_entry):
     """
     Save file move operation to history for undo functionality.
     """
-    history_file = downloads_path / '.organize_history.json'
+    history_file = downloads_path / _HISTORY_NAME
     
     try:
         # Load existing history
@@ -135,123 +225,223 @@ def save_history(downloads_path, history_entry):
         else:
             history = {'operations': []}
         
-        # Add new entry
-        history['operations'].append(history_entry)
-        
-        # Keep only last 100 operations to prevent file from growing too large
-        history['operations'] = history['operations'][-100:]
+        # Add new entry, keeping only the last 100 operations to prevent the
+        # file from growing too large (the deque drops the oldest on append)
+        operations = deque(history.get('operations', []), maxlen=100)
+        operations.append(history_entry)
+        history['operations'] = list(operations)
         
         # Save history
-        with open(history_file, 'w', encoding='utf-8') as f:
-            json.dump(history, f, indent=2)
+        _write_history(history_file, history)
     except Exception as e:
         logging.getLogger(__name__).warning(f"Could not save history: {e}")
 
 
-def organize_downloads(downloads_path, dry_run=False, by_date=False):
+def _target_key(target_path):
     """
-    Main function to organize files in the Downloads folder.
-    
-    Args:
-        downloads_path: Path to the folder to organize
-        dry_run: If True, only preview changes without moving files
-        by_date: If True, organize into year/month subfolders
+    Key used to spot two planned moves landing on the same file.
+    Windows and macOS filesystems ignore case by default, so case variants
+    of a name count as the same destination there.
+    """
+    if sys.platform in ('win32', 'darwin'):
+        return os.path.normcase(target_path).casefold()
+    return target_path
+
+
+def plan_moves(downloads_path, entries, by_date=False):
+    """
+    Decide where each file should go without touching the filesystem
+    (apart from checking existing target folders for files with the same name).
+    Returns the list of planned moves and the number of skipped files.
     """
     logger = logging.getLogger(__name__)
     
-    # Statistics
-    stats = defaultdict(int)
+    plan = []
     skipped = 0
     
-    # Track operations for history
-    operations = []
+    downloads_str = os.fspath(downloads_path)
     
-    logger.info(f"Starting organization of: {downloads_path}")
-    logger.info(f"Dry run mode: {dry_run}")
-    if by_date:
-        logger.info(f"Date-based organization: enabled")
-    logger.info("-" * 60)
+    # Target folder per category (or per category/year/month when by_date)
+    target_folders = {}
     
-    # Get all files in Downloads (non-recursive)
-    try:
-        files = [f for f in downloads_path.iterdir() if f.is_file()]
-    except PermissionError:
-        logger.error(f"Permission denied accessing: {downloads_path}")
-        return
+    # Destinations already claimed by earlier files in this plan
+    planned_targets = set()
     
-    # Record session start time
-    session_timestamp = datetime.now().isoformat()
+    # Whether each target folder already exists. Files in a folder this run
+    # will create cannot clash with anything on disk, so they need no probe.
+    folder_exists = {}
     
-    for file_path in files:
+    def is_taken(target_folder, target_path):
+        if _target_key(target_path) in planned_targets:
+            return True
+        return folder_exists[target_folder] and os.path.lexists(target_path)
+    
+    for entry in entries:
         try:
-            # Skip system/hidden files
-            if is_system_or_hidden(file_path):
-                logger.debug(f"Skipping hidden/system file: {file_path.name}")
+            # Skip the log file, config, and history files
+            if entry.name in _SKIP_NAMES:
                 skipped += 1
                 continue
             
-            # Skip the log file, config, and history files
-            if file_path.name in ['organize.log', 'organize_config.json', '.organize_history.json']:
+            # Skip system/hidden files
+            if is_system_or_hidden(entry):
+                logger.debug("Skipping hidden/system file: %s", entry.name)
                 skipped += 1
                 continue
             
             # Get file extension and category
-            file_extension = file_path.suffix
+            _, dot, ext = entry.name.rpartition('.')
+            file_extension = '.' + ext if dot and ext else ''
             category = get_category(file_extension)
             
             if category is None:
-                logger.info(f"No category for: {file_path.name} (extension: {file_extension})")
+                logger.info("No category for: %s (extension: %s)", entry.name, file_extension)
                 skipped += 1
                 continue
             
-            # Create target folder (with optional date-based subfolder)
+            # Pick target folder (with optional date-based subfolder)
             if by_date:
-                # Get file modification time
-                mod_time = datetime.fromtimestamp(file_path.stat().st_mtime)
-                year = mod_time.strftime('%Y')
-                month = mod_time.strftime('%B')  # Full month name
-                target_folder = downloads_path / category / year / month
+                # Get file modification time (DirEntry caches the stat result;
+                # only taken in this branch so plain runs never stat files)
+                st = entry.stat(follow_symlinks=False)
+                mod_time = datetime.fromtimestamp(st.st_mtime)
+                bucket = (category, mod_time.year, mod_time.month)
             else:
-                target_folder = downloads_path / category
+                bucket = category
             
-            if not dry_run:
-                target_folder.mkdir(parents=True, exist_ok=True)
+            # Build each target folder path once per bucket
+            target_folder = target_folders.get(bucket)
+            if target_folder is None:
+                category_root = os.path.join(downloads_str, category)
+                if by_date:
+                    year = str(mod_time.year)
+                    month = _MONTHS[mod_time.month - 1]  # Full month name
+                    target_folder = os.path.join(category_root, year, month)
+                else:
+                    target_folder = category_root
+                target_folders[bucket] = target_folder
+                folder_exists[target_folder] = os.path.isdir(target_folder)
             
             # Determine target path
-            target_path = target_folder / file_path.name
+            target_path = os.path.join(target_folder, entry.name)
             
             # Handle duplicate filenames
-            counter = 1
-            original_target = target_path
-            while target_path.exists():
-                stem = original_target.stem
-                suffix = original_target.suffix
-                target_path = target_folder / f"{stem}_{counter}{suffix}"
-                counter += 1
+            if is_taken(target_folder, target_path):
+                stem, suffix = os.path.splitext(entry.name)
+                counter = 1
+                target_path = os.path.join(target_folder, f"{stem}_{counter}{suffix}")
+                while is_taken(target_folder, target_path):
+                    counter += 1
+                    target_path = os.path.join(target_folder, f"{stem}_{counter}{suffix}")
             
-            # Move file
-            relative_target = target_path.relative_to(downloads_path)
-            
-            if dry_run:
-                logger.info(f"[DRY RUN] Would move: {file_path.name} → {relative_target}")
-            else:
-                shutil.move(str(file_path), str(target_path))
-                logger.info(f"Moved: {file_path.name} → {relative_target}")
-                
-                # Record operation for undo
-                operations.append({
-                    'timestamp': session_timestamp,
-                    'source': str(file_path),
-                    'destination': str(target_path),
-                    'filename': file_path.name
-                })
-            
-            stats[category] += 1
+            planned_targets.add(_target_key(target_path))
+            plan.append(PlannedMove(entry.path, entry.name, category, target_folder, target_path))
             
         except Exception as e:
-            logger.error(f"Error processing {file_path.name}: {e}")
+            logger.error("Error processing %s: %s", entry.name, e)
             skipped += 1
     
+    return plan, skipped
+
+
+def execute_plan(plan, jobs=1):
+    """
+    Create the target folders, then run the planned moves.
+    Returns one entry per planned move, in order: None on success or the exception.
+    """
+    # Create each target folder once, before any file is moved into it
+    folder_errors = {}
+    for target_folder in dict.fromkeys(move.target_folder for move in plan):
+        try:
+            os.makedirs(target_folder, exist_ok=True)
+        except Exception as e:
+            folder_errors[target_folder] = e
+    
+    errors = [folder_errors.get(move.target_folder) for move in plan]
+    pending = [i for i, error in enumerate(errors) if error is None]
+    
+    moves = [(plan[i].source, plan[i].target_path) for i in pending]
+    for i, error in zip(pending, run_moves(moves, jobs=jobs)):
+        errors[i] = error
+    
+    return errors
+
+
+def organize_downloads(downloads_path, dry_run=False, by_date=False, jobs=1):
+    """
+    Main function to organize files in the Downloads folder.
+    
+    Args:
+        downloads_path: Path to the folder to organize
+        dry_run: If True, only preview changes without moving files
+        by_date: If True, organize into year/month subfolders
+        jobs: Number of files to move concurrently
+    """
+    logger = logging.getLogger(__name__)
+    
+    # Statistics
+    stats = defaultdict(int)
+    
+    # Track operations for history
+    operations = []
+    
+    logger.info(f"Starting organization of: {downloads_path}")
+    logger.info(f"Dry run mode: {dry_run}")
+    if by_date:
+        logger.info(f"Date-based organization: enabled")
+    logger.info("-" * 60)
+    
+    # Paths are handled as plain strings from here on; Path is only the API type
+    downloads_str = os.fspath(downloads_path)
+    
+    # Get all files in Downloads (non-recursive). os.scandir() answers
+    # is_file() from the directory listing, saving a stat() per entry.
+    try:
+        with os.scandir(downloads_str) as it:
+            entries = [e for e in it if e.is_file(follow_symlinks=False)]
+    except PermissionError:
+        logger.error(f"Permission denied accessing: {downloads_path}")
+        return
+    
+    # Record session start time
+    session_timestamp = datetime.now().isoformat()
+    
+    # Plan every move first so duplicate-name handling sees one consistent
+    # view of the destination folders, then run the moves
+    plan, skipped = plan_moves(downloads_str, entries, by_date=by_date)
+    
+    # Relative paths are only worked out when the per-file lines are emitted
+    log_moves = logger.isEnabledFor(logging.INFO)
+    
+    if dry_run:
+        for move in plan:
+            if log_moves:
+                relative_target = os.path.relpath(move.target_path, downloads_str)
+                logger.info("[DRY RUN] Would move: %s → %s", move.filename, relative_target)
+            stats[move.category] += 1
+    else:
+        errors = execute_plan(plan, jobs=jobs)
+        
+        for move, error in zip(plan, errors):
+            if error is not None:
+                logger.error("Error processing %s: %s", move.filename, error)
+                skipped += 1
+                continue
+            
+            if log_moves:
+                relative_target = os.path.relpath(move.target_path, downloads_str)
+                logger.info("Moved: %s → %s", move.filename, relative_target)
+            
+            # Record operation for undo
+            operations.append({
+                'timestamp': session_timestamp,
+                'source': move.source,
+                'destination': move.target_path,
+                'filename': move.filename
+            })
+            
+            stats[move.category] += 1
+    
     # Print summary
     logger.info("-" * 60)
     logger.info("SUMMARY:")
@@ -278,7 +468,7 @@ def undo_last_operation(downloads_path):
     Undo the last organization operation.
     """
     logger = logging.getLogger(__name__)
-    history_file = downloads_path / '.organize_history.json'
+    history_file = downloads_path / _HISTORY_NAME
     
     if not history_file.exists():
         logger.error("No history file found. Nothing to undo.")
@@ -306,23 +496,22 @@ def undo_last_operation(downloads_path):
         # Reverse the operations
         for op in reversed(operations):
             try:
-                source = Path(op['destination'])
-                dest = Path(op['source'])
+                source = op['destination']
+                dest = op['source']
                 
-                if source.exists():
-                    shutil.move(str(source), str(dest))
-                    logger.info(f"Restored: {op['filename']}")
+                if os.path.exists(source):
+                    move_file(source, dest)
+                    logger.info("Restored: %s", op['filename'])
                     success_count += 1
                 else:
-                    logger.warning(f"File not found, skipping: {op['filename']}")
+                    logger.warning("File not found, skipping: %s", op['filename'])
                     error_count += 1
             except Exception as e:
-                logger.error(f"Error restoring {op['filename']}: {e}")
+                logger.error("Error restoring %s: %s", op['filename'], e)
                 error_count += 1
         
         # Save updated history
-        with open(history_file, 'w', encoding='utf-8') as f:
-            json.dump(history, f, indent=2)
+        _write_history(history_file, history)
         
         logger.info("-" * 60)
         logger.info(f"Undo complete: {success_count} files restored, {error_count} errors")
@@ -335,6 +524,8 @@ def main():
     """
     Entry point for the script.
     """
+    import argparse  # Imported here so library use of this module skips it
+    
     parser = argparse.ArgumentParser(
         description='Organize your Downloads folder automatically',
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -345,6 +536,8 @@ Examples:
   python organize_downloads.py --path /custom/path  # Organize custom folder
   python organize_downloads.py --by-date            # Organize into year/month subfolders
   python organize_downloads.py --undo               # Undo last organization
+  python organize_downloads.py --quiet              # Only show warnings/errors on console
+  python organize_downloads.py --jobs 8             # Move up to 8 files at a time
         """
     )
     
@@ -372,8 +565,25 @@ Examples:
         help='Undo the last organization operation'
     )
     
+    parser.add_argument(
+        '--quiet',
+        action='store_true',
+        help='Only show warnings and errors on the console (organize.log still gets everything)'
+    )
+    
+    parser.add_argument(
+        '--jobs',
+        type=int,
+        default=1,
+        help=f'Number of files to move concurrently, 1 to {MAX_JOBS} (default: 1). '
+             'Mostly helps on SSDs and network drives'
+    )
+    
     args = parser.parse_args()
     
+    if not 1 <= args.jobs <= MAX_JOBS:
+        parser.error(f'--jobs must be between 1 and {MAX_JOBS}, got {args.jobs}')
+    
     # Determine Downloads folder
     if args.path:
         downloads_path = Path(args.path)
@@ -390,7 +600,7 @@ Examples:
         sys.exit(1)
     
     # Setup logging
-    setup_logging(downloads_path)
+    setup_logging(downloads_path, quiet=args.quiet)
     
     # Handle undo operation
     if args.undo:
@@ -402,10 +612,11 @@ Examples:
     custom_categories = load_config(downloads_path)
     if custom_categories:
         CATEGORIES = custom_categories
+        _rebuild_ext_index()
         logging.getLogger(__name__).info("Loaded custom categories from organize_config.json")
     
     # Run organization
-    organize_downloads(downloads_path, dry_run=args.dry_run, by_date=args.by_date)
+    organize_downloads(downloads_path, dry_run=args.dry_run, by_date=args.by_date, jobs=args.jobs)
 
 
 if __name__ == '__main__':